@@ -0,0 +1,25 @@
+"""
+Shared pytest setup for the OpenFan hardware tests
+Runs mDNS discovery once per session so tests reuse the same fan list
+"""
+
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def _discover_fans():
+    """Browse for fans once; later callers get the cached result"""
+    # Imported here so a pytest run without hardware tests needs no zeroconf
+    from test_fan_api import FanDiscoveryTest
+    return tuple(FanDiscoveryTest().discover_fans(timeout=3))
+
+
+def pytest_generate_tests(metafunc):
+    """Run per-fan tests once for every discovered fan"""
+    if "hostname" in metafunc.fixturenames:
+        fans = _discover_fans()
+        metafunc.parametrize(
+            ("hostname", "ip"),
+            [(fan['hostname'], fan.get('ip')) for fan in fans],
+            ids=[fan['hostname'] for fan in fans]
+        )
@@ -2,32 +2,58 @@
 """Test fan discovery without GUI"""
 
 import sys
-import time
 from wayopenfan import FanDiscovery
-from PyQt6.QtCore import QCoreApplication
-
-def on_fan_discovered(fan):
-    print(f"✓ Discovered fan: {fan.name} at {fan.ip}:{fan.port}")
-    print(f"  Serial: {fan.serial_number}")
-    print(f"  Status: {'ON' if fan.is_on else 'OFF'}, Speed: {fan.speed}%, RPM: {fan.rpm}")
+from PyQt6.QtCore import QCoreApplication, QTimer
 
 def main():
     app = QCoreApplication(sys.argv)
     
+    # Optionally stop as soon as N fans have been found
+    expected_fans = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    # Optionally keep browsing for longer (e.g. past 2x the record TTL) to
+    # check that online fans are refreshed rather than dropped and re-added
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    # An explicit duration means browsing for the full time, so don't quit
+    # as soon as the expected fans show up
+    stop_early = len(sys.argv) <= 2
+    found = []
+    removed = []
+    
+    def on_fan_discovered(fan):
+        print(f"✓ Discovered fan: {fan.name} at {fan.ip}:{fan.port}")
+        print(f"  Serial: {fan.serial_number}")
+        found.append(fan)
+        if expected_fans and len(found) >= expected_fans and stop_early:
+            app.quit()
+    
+    def on_fan_updated(fan):
+        print(f"  {fan.name} status: {'ON' if fan.is_on else 'OFF'}, Speed: {fan.speed}%, RPM: {fan.rpm}")
+    
+    def on_fan_removed(serial):
+        print(f"- Fan removed: {serial}")
+        removed.append(serial)
+    
     discovery = FanDiscovery()
     discovery.fan_discovered.connect(on_fan_discovered)
+    discovery.fan_removed.connect(on_fan_removed)
+    discovery.fan_updated.connect(on_fan_updated)
     
     print("Starting fan discovery...")
     discovery.start()
     
-    # Run for 5 seconds
-    QCoreApplication.processEvents()
-    time.sleep(5)
+    # Run the event loop so signals are delivered as fans arrive
+    QTimer.singleShot(int(duration * 1000), app.quit)
+    app.exec()
     
     print("\nStopping discovery...")
-    discovery.stop()
+    discovery.close()
     
     print("Test complete!")
+    
+    if removed:
+        print(f"✗ {len(removed)} fan(s) dropped during discovery: {', '.join(removed)}")
+        sys.exit(1)
+    print(f"✓ No fans dropped in {duration:g}s")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,54 +4,109 @@ Test script for OpenFan API integration
 Tests discovery and control of OpenFan devices on the network
 """
 
+import os
+import sys
 import time
 import json
-from typing import List
+import socket
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from zeroconf import ServiceBrowser, Zeroconf, ServiceInfo
 
+log = logging.getLogger(__name__)
+
+# Last discovery result, so warm runs can skip the mDNS wait
+_CACHE = Path.home() / ".cache" / "wayopenfan" / "discovery.json"
+
+
+def _make_session(retries: int = 3) -> requests.Session:
+    """Create a session so every call to a fan reuses one keep-alive connection
+    
+    HTTP/1.1 keep-alive is the best we can get here: the fans serve plain
+    http://, so there is no TLS ALPN to negotiate HTTP/2 with.
+    """
+    session = requests.Session()
+    # Ride out a dropped packet or a busy fan instead of failing the step
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.2,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"])
+    )
+    session.mount("http://", HTTPAdapter(
+        max_retries=retry,
+        pool_connections=16,
+        pool_maxsize=32,
+        pool_block=False
+    ))
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
 class FanDiscoveryTest:
     """Test mDNS discovery for OpenFan devices"""
     
+    _PREFIX = "uOpenFan"
+    
     def __init__(self):
         self.zeroconf = None
         self.browser = None
         self.discovered_fans = []
+        self._found_event = threading.Event()
+        self._expected = None
         
     def add_service(self, zeroconf, type_, name):
         """Called when a service is discovered"""
+        # Filter by name first so unrelated services never trigger a lookup
+        if not name.startswith(self._PREFIX):
+            return
         info = zeroconf.get_service_info(type_, name)
-        if info and name.startswith("uOpenFan"):
-            hostname = name.split('.')[0]
-            ip = None
-            if info.addresses:
-                ip = ".".join(map(str, info.addresses[0]))
-            
-            print(f"✓ Found fan: {name}")
-            print(f"  Hostname: {hostname}")
-            if ip:
-                print(f"  IP: {ip}")
-            
-            self.discovered_fans.append({
-                'name': name,
-                'hostname': hostname,
-                'ip': ip,
-                'info': info
-            })
+        # get_service_info returns None when the lookup times out
+        if info is None:
+            return
+        hostname = name.split('.')[0]
+        ip = socket.inet_ntoa(info.addresses[0]) if info.addresses else None
+        
+        print(f"✓ Found fan: {name}")
+        print(f"  Hostname: {hostname}")
+        if ip:
+            print(f"  IP: {ip}")
+        
+        self.discovered_fans.append({
+            'name': name,
+            'hostname': hostname,
+            'ip': ip,
+            'info': info
+        })
+        if self._expected and len(self.discovered_fans) >= self._expected:
+            self._found_event.set()
     
     def remove_service(self, zeroconf, type_, name):
         """Called when a service is removed"""
         print(f"- Fan removed: {name}")
     
     def update_service(self, zeroconf, type_, name):
-        """Called when a service is updated"""
-        pass
+        """Called when a service is updated
+        
+        Intentionally a no-op that does no parsing: updates are ignored here.
+        The method must still exist, as zeroconf warns about listeners that
+        lack it.
+        """
     
-    def discover_fans(self, timeout=5):
-        """Run discovery for specified timeout"""
+    def discover_fans(self, timeout=5, expected=None):
+        """Run discovery until `expected` fans are found or the timeout expires"""
         print("Starting mDNS discovery for OpenFan devices...")
-        print(f"Searching for _http._tcp.local. services starting with 'uOpenFan'")
+        print(f"Searching for _http._tcp.local. services starting with '{self._PREFIX}'")
         print("-" * 50)
         
+        self._expected = expected
+        self._found_event.clear()
         self.zeroconf = Zeroconf()
         self.browser = ServiceBrowser(
             self.zeroconf,
@@ -59,8 +114,8 @@ class FanDiscoveryTest:
             self
         )
         
-        # Wait for discovery
-        time.sleep(timeout)
+        # Wait for discovery, returning early once enough fans answered
+        self._found_event.wait(timeout)
         
         # Cleanup
         self.zeroconf.close()
@@ -70,10 +125,8 @@ class FanDiscoveryTest:
         return self.discovered_fans
 
 
-def test_fan_api(hostname, ip=None):
+def test_fan_api(hostname, ip):
     """Test OpenFan API endpoints"""
-    import requests
-    
     # Use IP if available, otherwise try hostname
     if ip:
         base_url = f"http://{ip}"
@@ -82,115 +135,215 @@ def test_fan_api(hostname, ip=None):
     print(f"\nTesting OpenFan API at {base_url} ({hostname})")
     print("=" * 50)
     
+    # All endpoint URLs for this fan, built once
+    status_url = f"{base_url}/api/v0/fan/status"
+    set_url_tpl = f"{base_url}/api/v0/fan/0/set?value={{}}"
+    
+    # One session per call so fans tested in parallel don't share a pool
+    session = _make_session()
+    # Every failed step is recorded so the test fails after restoring the fan
+    failures: List[str] = []
+    
+    def _call(url):
+        """GET an API URL and return its JSON body, or None after recording a failure"""
+        try:
+            response = session.get(url, timeout=2)
+            if not response.ok:
+                print(f"   ✗ Unexpected status code: {response.status_code}")
+                failures.append(f"{url}: HTTP {response.status_code}")
+                return None
+            data = response.json()
+            log.debug("   Response: %s", data)
+        except Exception as e:
+            print(f"   ✗ Error: {e}")
+            failures.append(f"{url}: {e}")
+            return None
+        if not isinstance(data, dict) or data.get("status") != "ok":
+            print(f"   ✗ Unexpected response: {data}")
+            failures.append(f"{url}: unexpected response {data!r}")
+            return None
+        return data
+    
+    def _check_status(data):
+        """Record a failure unless a status payload carries numeric rpm and pwm_percent"""
+        if data is None:
+            return
+        for key in ("rpm", "pwm_percent"):
+            if not isinstance(data.get(key), (int, float)):
+                failures.append(f"{status_url}: missing or non-numeric {key!r} in {data!r}")
+    
+    def _wait_pwm(target, deadline=2.0):
+        """Poll status until the fan reports the target PWM or the deadline passes"""
+        start = time.monotonic()
+        while time.monotonic() - start < deadline:
+            try:
+                response = session.get(status_url, timeout=1)
+                if response.ok and abs(response.json().get("pwm_percent", -1) - target) <= 1:
+                    return True
+            except Exception:
+                pass
+            time.sleep(0.1)
+        print(f"   ⚠ Fan did not reach {target}% within {deadline}s")
+        failures.append(f"fan did not report {target}% within {deadline}s")
+        return False
+    
     # Test 1: Get status
     print("\n1. Testing GET /api/v0/fan/status")
-    try:
-        response = requests.get(f"{base_url}/api/v0/fan/status", timeout=2)
-        print(f"   Status code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   Response: {json.dumps(data, indent=2)}")
-            if data.get("status") == "ok":
-                print(f"   ✓ Current RPM: {data.get('rpm', 'N/A')}")
-                print(f"   ✓ Current PWM: {data.get('pwm_percent', 'N/A')}%")
-        else:
-            print(f"   ✗ Unexpected status code: {response.status_code}")
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    data = _call(status_url)
+    _check_status(data)
+    if data:
+        print(f"   ✓ Current RPM: {data.get('rpm', 'N/A')}")
+        print(f"   ✓ Current PWM: {data.get('pwm_percent', 'N/A')}%")
     
     # Test 2: Set fan speed to 30%
     print("\n2. Testing SET fan speed to 30%")
-    try:
-        response = requests.get(f"{base_url}/api/v0/fan/0/set?value=30", timeout=2)
-        print(f"   Status code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   Response: {json.dumps(data, indent=2)}")
-            if data.get("status") == "ok":
-                print("   ✓ Speed set successfully")
-        time.sleep(2)  # Wait for fan to adjust
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    data = _call(set_url_tpl.format(30))
+    if data:
+        print("   ✓ Speed set successfully")
+        _wait_pwm(30)  # Wait for fan to adjust
     
     # Test 3: Verify speed changed
     print("\n3. Verifying speed change")
-    try:
-        response = requests.get(f"{base_url}/api/v0/fan/status", timeout=2)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   Current PWM: {data.get('pwm_percent', 'N/A')}%")
-            print(f"   Current RPM: {data.get('rpm', 'N/A')}")
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    data = _call(status_url)
+    _check_status(data)
+    if data:
+        print(f"   Current PWM: {data.get('pwm_percent', 'N/A')}%")
+        print(f"   Current RPM: {data.get('rpm', 'N/A')}")
     
     # Test 4: Set fan to 70%
     print("\n4. Testing SET fan speed to 70%")
-    try:
-        response = requests.get(f"{base_url}/api/v0/fan/0/set?value=70", timeout=2)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("status") == "ok":
-                print("   ✓ Speed set to 70%")
-        time.sleep(2)
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    data = _call(set_url_tpl.format(70))
+    if data:
+        print("   ✓ Speed set to 70%")
+        _wait_pwm(70)
     
     # Test 5: Turn off (0%)
     print("\n5. Testing turn OFF (0%)")
-    try:
-        response = requests.get(f"{base_url}/api/v0/fan/0/set?value=0", timeout=2)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("status") == "ok":
-                print("   ✓ Fan turned off")
-        time.sleep(2)
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    data = _call(set_url_tpl.format(0))
+    if data:
+        print("   ✓ Fan turned off")
+        _wait_pwm(0)
     
     # Test 6: Final status check
     print("\n6. Final status check")
-    try:
-        response = requests.get(f"{base_url}/api/v0/fan/status", timeout=2)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   Final PWM: {data.get('pwm_percent', 'N/A')}%")
-            print(f"   Final RPM: {data.get('rpm', 'N/A')}")
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    data = _call(status_url)
+    _check_status(data)
+    if data:
+        print(f"   Final PWM: {data.get('pwm_percent', 'N/A')}%")
+        print(f"   Final RPM: {data.get('rpm', 'N/A')}")
     
     # Test 7: Restore to 50%
     print("\n7. Restoring to 50%")
+    data = _call(set_url_tpl.format(50))
+    if data:
+        print("   ✓ Fan restored to 50%")
+    
+    session.close()
+    assert not failures, f"{hostname}: " + "; ".join(failures)
+    
+    # A retry may reconnect after a failure, so check keep-alive reuse on a
+    # session that never retries: every request must ride one connection
+    with _make_session(retries=0) as probe:
+        for _ in range(3):
+            probe.get(status_url, timeout=2).raise_for_status()
+        pool = probe.get_adapter(base_url).poolmanager.connection_from_url(base_url)
+        assert pool.num_connections == 1, \
+            f"{hostname}: opened {pool.num_connections} connections, expected 1"
+    print("\n   ✓ Connection reused for all requests")
+
+
+def _load_cached_fans() -> Optional[List[dict]]:
+    """Return the cached fans if every one still answers, otherwise None"""
     try:
-        response = requests.get(f"{base_url}/api/v0/fan/0/set?value=50", timeout=2)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("status") == "ok":
-                print("   ✓ Fan restored to 50%")
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+        cached = json.loads(_CACHE.read_text())
+    except (OSError, ValueError):
+        return None
+    # A cache of the wrong shape is treated like a missing one
+    if not cached or not isinstance(cached, dict):
+        return None
+    if not all(isinstance(fan, dict) and 'ip' in fan and 'name' in fan
+               for fan in cached.values()):
+        return None
+    
+    # One quick try per fan: a stale address should not sit through retries
+    with requests.Session() as session:
+        session.mount("http://", HTTPAdapter(max_retries=0))
+        for hostname, fan in cached.items():
+            try:
+                session.get(f"http://{fan['ip']}/api/v0/fan/status", timeout=0.5).raise_for_status()
+            except requests.RequestException:
+                # Stale address, forget it and fall back to a full discovery
+                print(f"Cached address for {hostname} did not answer, rediscovering...")
+                del cached[hostname]
+                try:
+                    _CACHE.write_text(json.dumps(cached))
+                except OSError as e:
+                    print(f"Could not write discovery cache: {e}")
+                return None
+    
+    print(f"Using {len(cached)} cached fan(s) from {_CACHE}")
+    return [{'name': fan['name'], 'hostname': hostname, 'ip': fan['ip']}
+            for hostname, fan in cached.items()]
+
+
+def _save_cached_fans(fans: List[dict]):
+    """Remember discovered fans that have a usable address"""
+    cached = {fan['hostname']: {'name': fan['name'], 'ip': fan['ip']}
+              for fan in fans if fan.get('ip')}
+    try:
+        _CACHE.parent.mkdir(parents=True, exist_ok=True)
+        _CACHE.write_text(json.dumps(cached))
+    except OSError as e:
+        print(f"Could not write discovery cache: {e}")
 
 
 def main():
+    # Raw responses are only formatted when WAYOPENFAN_DEBUG=1
+    logging.basicConfig(
+        level=logging.DEBUG if os.environ.get("WAYOPENFAN_DEBUG") == "1" else logging.INFO,
+        format="%(message)s"
+    )
+    
     print("OpenFan Network Discovery and API Test")
     print("=" * 70)
     
-    # Step 1: Discover fans
-    discovery = FanDiscoveryTest()
-    fans = discovery.discover_fans(timeout=3)
+    # Step 1: Reuse cached fans, or discover them (optionally stopping as
+    # soon as N fans are found)
+    fans = _load_cached_fans()
+    if fans is None:
+        expected = int(sys.argv[1]) if len(sys.argv) > 1 else None
+        discovery = FanDiscoveryTest()
+        fans = discovery.discover_fans(timeout=3, expected=expected)
+        if fans:
+            _save_cached_fans(fans)
     
     if not fans:
         print("\n⚠ No OpenFan devices found on the network")
         print("Make sure your OpenFan devices are powered on and connected to the network")
         return
     
-    # Step 2: Test each discovered fan
-    for fan in fans:
-        hostname = fan['hostname']
-        ip = fan.get('ip')
-        test_fan_api(hostname, ip)
-        print("\n" + "=" * 70)
+    # Step 2: Test all discovered fans in parallel; one failing fan must not
+    # cut the others short
+    failed = {}
+    with ThreadPoolExecutor(max_workers=min(8, len(fans))) as executor:
+        futures = {executor.submit(test_fan_api, fan['hostname'], fan.get('ip')): fan['hostname']
+                   for fan in fans}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except AssertionError as e:
+                failed[futures[future]] = e
+    print("\n" + "=" * 70)
+    
+    for hostname in sorted(futures.values()):
+        if hostname in failed:
+            print(f"✗ {failed[hostname]}")
+        else:
+            print(f"✓ {hostname}")
     
     print("\nTest complete!")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
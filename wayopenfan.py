@@ -6,26 +6,146 @@ WayOpenFan - System tray application for controlling OpenFan devices on Wayland/
 import os
 import sys
 import json
+import time
+import queue
+import socket
 import threading
+import http.client
 
 # Suppress Qt style warnings
 os.environ.pop('QT_STYLE_OVERRIDE', None)
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
-from concurrent.futures import ThreadPoolExecutor
-import requests
-import requests.adapters
-from zeroconf import ServiceBrowser, Zeroconf, ServiceInfo
+from concurrent.futures import ThreadPoolExecutor, Future
+from zeroconf import ServiceBrowser, Zeroconf, ServiceInfo, IPVersion
 from PyQt6.QtWidgets import (
     QApplication, QSystemTrayIcon, QMenu, QWidget, QPushButton,
     QSlider, QLabel, QHBoxLayout, QVBoxLayout, QCheckBox, QFrame,
-    QGraphicsDropShadowEffect
+    QGraphicsDropShadowEffect, QStyle, QProxyStyle
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QPoint, QRect, QEvent
-from PyQt6.QtGui import QIcon, QAction, QCursor, QScreen, QPalette, QColor, QMouseEvent
+from PyQt6.QtCore import (
+    Qt, QTimer, pyqtSignal, pyqtSlot, QObject, QPoint, QRect, QEvent, QMetaObject, Q_ARG,
+    QSignalBlocker
+)
+from PyQt6.QtGui import QIcon, QAction, QCursor, QScreen, QPalette, QColor
+
+# Prefer orjson for the frequent status payloads, fall back to the stdlib
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Ask the fan firmware to keep sockets open between polls, and skip
+# compression negotiation for the tiny JSON replies
+KEEPALIVE_HEADERS = {
+    'Connection': 'keep-alive',
+    'Keep-Alive': 'timeout=30, max=100',
+    'Accept-Encoding': 'identity'
+}
+
+# Polled at up to 2 Hz per fan, so it gets its own lightweight connection
+STATUS_PATH = "/api/v0/fan/status"
+SET_PATH = "/api/v0/fan/0/set"
+# (connect, read) timeouts: polls fail fast on a dead fan, writes get more slack
+STATUS_TIMEOUT = (0.5, 1.0)
+SET_TIMEOUT = (1.0, 3.0)
+# Status younger than this is reused, so overlapping pollers (discovery,
+# popup show, timer) share one request; kept below the 500ms poll interval
+STATUS_TTL = 0.4
+
+# Fans seen on the last run, shown at startup before mDNS answers
+FAN_CACHE = Path.home() / ".cache" / "wayopenfan" / "fans.json"
+
+TRAY_ICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fan-icon.svg")
+# Built lazily, since a QIcon needs the QApplication to exist
+_tray_icon: Optional[QIcon] = None
+# Shared by every speed slider, also built once the QApplication exists
+_slider_style: Optional[QProxyStyle] = None
 
 
-@dataclass
+class _KeepAliveConnection:
+    """A persistent HTTP connection to one fan, used by one request at a time
+    
+    abort() may be called from any thread to fail a request in flight at once
+    instead of waiting out its timeout; the connection is unusable afterwards.
+    """
+    __slots__ = ("host", "port", "timeout", "_conn", "_lock", "_aborted")
+    
+    def __init__(self, host: str, port: int, timeout: Tuple[float, float]):
+        self.host = host
+        self.port = port
+        self.timeout = timeout  # (connect, read)
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._lock = threading.Lock()
+        self._aborted = False
+    
+    def get(self, path: str) -> bytes:
+        """GET a path and return the body, reconnecting once on a stale socket"""
+        with self._lock:
+            for attempt in range(2):
+                if self._aborted:
+                    raise ConnectionAbortedError(f"Connection to {self.host} was aborted")
+                try:
+                    if self._conn is None:
+                        connect_timeout, read_timeout = self.timeout
+                        self._conn = http.client.HTTPConnection(self.host, self.port, timeout=connect_timeout)
+                        # connect() also sets TCP_NODELAY, so small requests
+                        # are never held back by Nagle's algorithm
+                        self._conn.connect()
+                        self._conn.sock.settimeout(read_timeout)
+                        if self._aborted:
+                            # abort() ran while we were still connecting
+                            raise ConnectionAbortedError(f"Connection to {self.host} was aborted")
+                    self._conn.request("GET", path, headers=KEEPALIVE_HEADERS)
+                    response = self._conn.getresponse()
+                    body = response.read()
+                except (http.client.HTTPException, ConnectionError):
+                    # The fan may have dropped the idle connection; reconnect once
+                    self._drop()
+                    if attempt:
+                        raise
+                    continue
+                except OSError:
+                    self._drop()
+                    raise
+                if response.will_close:
+                    self._drop()
+                if response.status != 200:
+                    raise http.client.HTTPException(f"HTTP {response.status} from {path}")
+                return body
+    
+    def _drop(self):
+        """Close the socket; the next request reconnects"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def abort(self):
+        """Shut the socket down without waiting for a request in flight"""
+        self._aborted = True
+        conn = self._conn
+        # Read the socket once: the request thread may close it at any moment
+        sock = conn.sock if conn is not None else None
+        if sock is not None:
+            # The blocked request fails right away and drops the connection itself
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+    
+    def close(self):
+        """Close the connection for good without waiting for a request in flight"""
+        self.abort()
+        # A request in flight drops the socket itself once it fails
+        if self._lock.acquire(blocking=False):
+            try:
+                self._drop()
+            finally:
+                self._lock.release()
+
+
+@dataclass(slots=True, eq=False)  # Fans are tracked by identity, not value
 class Fan:
     """Represents an OpenFan device"""
     name: str
@@ -36,43 +156,98 @@ class Fan:
     speed: int = 50  # PWM percentage 0-100
     rpm: int = 0
     last_speed: int = 50  # Remember last speed for toggle
-    _session: Optional[requests.Session] = field(default=None, init=False, repr=False, compare=False)
+    # Single worker so user commands reach the fan in order
+    _cmd_executor: ThreadPoolExecutor = field(
+        default_factory=lambda: ThreadPoolExecutor(max_workers=1),
+        init=False, repr=False, compare=False
+    )
+    _cmd_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _queued_speed: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _cmd_future: Optional[Future] = field(default=None, init=False, repr=False, compare=False)
+    _base_url: str = field(default="", init=False, repr=False, compare=False)
+    # Persistent keep-alive connections: one for status polls, one for commands
+    _status_http: Optional[_KeepAliveConnection] = field(default=None, init=False, repr=False, compare=False)
+    _cmd_http: Optional[_KeepAliveConnection] = field(default=None, init=False, repr=False, compare=False)
+    # Consecutive failed polls, and how many upcoming polls to skip because of them
+    _poll_failures: int = field(default=0, init=False, repr=False, compare=False)
+    _polls_to_skip: int = field(default=0, init=False, repr=False, compare=False)
+    # (monotonic time, payload) of the last good status poll
+    _status_cache: Optional[Tuple[float, Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
+    # Guards the state fields below against a poll and a command landing together;
+    # the generation counts successful sets so older poll results can be dropped
+    _state_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _set_generation: int = field(default=0, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Address is fixed once discovered, so build the base URL once
+        self._base_url = f"http://{self.ip}:{self.port}"
+        self._status_http = _KeepAliveConnection(self.ip, self.port, STATUS_TIMEOUT)
+        self._cmd_http = _KeepAliveConnection(self.ip, self.port, SET_TIMEOUT)
     
     @property
     def base_url(self) -> str:
-        return f"http://{self.ip}:{self.port}"
+        return self._base_url
     
-    @property
-    def session(self) -> requests.Session:
-        """Get or create a session for connection pooling"""
-        if self._session is None:
-            self._session = requests.Session()
-            # Set adapter with connection pooling
-            adapter = requests.adapters.HTTPAdapter(
-                pool_connections=1,
-                pool_maxsize=2,
-                max_retries=1
-            )
-            self._session.mount('http://', adapter)
-        return self._session
+    def close(self):
+        """Release this fan's network resources; safe to call from the GUI thread"""
+        self._status_http.close()
+        self._cmd_http.close()
+    
+    def shutdown(self):
+        """Cancel queued commands and abort in-flight I/O, for app exit"""
+        self._cmd_executor.shutdown(wait=False, cancel_futures=True)
+        self._status_http.abort()
+        self._cmd_http.abort()
     
     def get_status(self) -> Optional[Dict[str, Any]]:
         """Get current fan status"""
+        cached = self._status_cache
+        if cached and time.monotonic() - cached[0] < STATUS_TTL:
+            return cached[1]
+        # Back off from a fan that keeps failing so it can't hog the poll pool
+        if self._polls_to_skip:
+            self._polls_to_skip -= 1
+            return None
         try:
-            response = self.session.get(f"{self.base_url}/api/v0/fan/status", timeout=3)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("status") == "ok":
-                    self.rpm = data.get("rpm", 0)
-                    self.speed = data.get("pwm_percent", 0)
-                    self.is_on = self.speed > 0
-                    if self.is_on:
-                        self.last_speed = self.speed
-                    return data
+            generation = self._set_generation
+            data = json_loads(self._status_http.get(STATUS_PATH))
+            self._poll_failures = 0
+            if data.get("status") == "ok":
+                with self._state_lock:
+                    # A set that completed while this poll was in flight wins
+                    if generation == self._set_generation:
+                        self.rpm = data.get("rpm", 0)
+                        self.speed = data.get("pwm_percent", 0)
+                        self.is_on = self.speed > 0
+                        if self.is_on:
+                            self.last_speed = self.speed
+                        self._status_cache = (time.monotonic(), data)
+                return data
         except Exception as e:
+            self._poll_failures += 1
+            if self._poll_failures >= 3:
+                # Skip 1, 2, 4, ... up to 16 polls while the fan stays unreachable
+                self._polls_to_skip = min(2 ** (self._poll_failures - 3), 16)
             print(f"Error getting status for {self.name}: {e}")
         return None
     
+    def refresh_status(self) -> Optional[bool]:
+        """Refresh this fan in place and return whether is_on, speed or rpm changed
+        
+        Returns None when no status arrived, because the poll failed or was skipped.
+        """
+        with self._state_lock:
+            before = (self.is_on, self.speed, self.rpm)
+        if self.get_status() is None:
+            return None
+        with self._state_lock:
+            return (self.is_on, self.speed, self.rpm) != before
+    
+    def reset_backoff(self):
+        """Poll an unreachable fan again right away, e.g. when the popup reopens"""
+        self._poll_failures = 0
+        self._polls_to_skip = 0
+    
     def get_friendly_name(self) -> str:
         """Get the friendly name for the fan"""
         # Remove uOpenFan prefix if present
@@ -86,20 +261,26 @@ class Fan:
             # Clamp speed to valid range
             speed = max(0, min(100, speed))
             
-            response = self.session.get(
-                f"{self.base_url}/api/v0/fan/0/set",
-                params={"value": speed},
-                timeout=3
-            )
+            # Nothing to send if a fresh status shows the fan already at this
+            # speed; any set clears the cache, so a fresh one postdates it
+            cached = self._status_cache
+            if (cached and time.monotonic() - cached[0] < STATUS_TTL
+                    and cached[1].get("pwm_percent") == speed):
+                self.speed = speed
+                self.is_on = speed > 0
+                return True
             
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("status") == "ok":
+            data = json_loads(self._cmd_http.get(f"{SET_PATH}?value={speed}"))
+            if data.get("status") == "ok":
+                with self._state_lock:
+                    # Cached and in-flight status both predate this change
+                    self._set_generation += 1
+                    self._status_cache = None
                     self.speed = speed
                     self.is_on = speed > 0
                     if self.is_on:
                         self.last_speed = speed
-                    return True
+                return True
         except Exception as e:
             print(f"Error setting speed for {self.name}: {e}")
         return False
@@ -116,24 +297,73 @@ class Fan:
     def toggle(self) -> bool:
         """Toggle fan on/off"""
         return self.set_power(not self.is_on)
+    
+    def set_speed_async(self, speed: int) -> Future:
+        """Queue a speed change; only the latest queued value is sent
+        
+        Returns the future of the request that will carry this value.
+        """
+        with self._cmd_lock:
+            if self._queued_speed is None:
+                self._cmd_future = self._cmd_executor.submit(self._send_queued_speed)
+            self._queued_speed = speed
+            return self._cmd_future
+    
+    def set_power_async(self, on: bool) -> Future:
+        """Queue a power change"""
+        return self.set_speed_async((self.last_speed if self.last_speed > 0 else 50) if on else 0)
+    
+    def get_status_async(self) -> Future:
+        """Queue a status poll behind any pending commands"""
+        return self._cmd_executor.submit(self.get_status)
+    
+    def _send_queued_speed(self) -> bool:
+        """Send the most recently queued speed from the command worker"""
+        with self._cmd_lock:
+            speed, self._queued_speed = self._queued_speed, None
+        if speed is None:
+            return True
+        return self.set_speed(speed)
 
 
 class FanDiscovery(QObject):
-    """Discovers OpenFan devices on the network using mDNS"""
+    """Discovers OpenFan devices on the network using mDNS
+    
+    Record refresh is left to zeroconf's ServiceBrowser, which re-queries
+    PTR records before their TTL expires, so fans that stay online are not
+    removed and re-added.
+    """
     
     fan_discovered = pyqtSignal(Fan)
     fan_removed = pyqtSignal(str)  # serial number
+    fan_updated = pyqtSignal(Fan)  # initial status arrived after discovery
     
-    def __init__(self):
+    def __init__(self, zeroconf: Optional[Zeroconf] = None):
         super().__init__()
-        self.zeroconf = None
+        # A caller-provided Zeroconf keeps its record cache warm across restarts
+        self.zeroconf = zeroconf
+        self._owns_zeroconf = zeroconf is None
         self.browser = None
         self.fans: Dict[str, Fan] = {}
-        self.executor = ThreadPoolExecutor(max_workers=2)
+        # The resolver thread, Zeroconf's thread and fan command workers all
+        # add and drop fans
+        self._fans_lock = threading.Lock()
+        # One thread resolves queued service names, so an announcement burst
+        # doesn't turn into a burst of blocking lookups
+        self._queue: queue.Queue = queue.Queue()
+        self._queued: set = set()
+        self._resolver: Optional[threading.Thread] = None
+        # Last (addresses, port) seen per service name, to skip repeat announcements
+        self._seen: Dict[str, tuple] = {}
         
     def start(self):
         """Start discovery service"""
-        self.zeroconf = Zeroconf()
+        if self.zeroconf is None:
+            # OpenFan devices only advertise IPv4 addresses
+            self.zeroconf = Zeroconf(ip_version=IPVersion.V4Only)
+        if self._resolver is None:
+            self._resolver = threading.Thread(target=self._resolve_loop, name="fan-resolver", daemon=True)
+            self._resolver.start()
         self.browser = ServiceBrowser(
             self.zeroconf,
             "_http._tcp.local.",
@@ -142,39 +372,83 @@ class FanDiscovery(QObject):
         print("Started OpenFan discovery service")
     
     def stop(self):
-        """Stop discovery service"""
-        if self.zeroconf:
-            self.zeroconf.close()
-            self.zeroconf = None
+        """Stop browsing, keeping Zeroconf and its cache for a later start"""
+        if self.browser:
+            self.browser.cancel()
             self.browser = None
-        self.executor.shutdown(wait=False)
         print("Stopped OpenFan discovery service")
     
+    def rescan(self):
+        """Browse again on the running Zeroconf, reusing its sockets, cache and resolver
+        
+        A new browser replays every cached service and sends fresh queries,
+        so a fan that moved to a new address is replaced by one pointing there.
+        """
+        if self.browser:
+            self.browser.cancel()
+            self.browser = None
+        self.start()
+    
+    def close(self):
+        """Stop discovery and release its threads and sockets"""
+        self.stop()
+        if self._resolver is not None:
+            self._queue.put(None)
+        if self._owns_zeroconf and self.zeroconf:
+            self.zeroconf.close()
+            self.zeroconf = None
+    
     def add_service(self, zeroconf: Zeroconf, type_: str, name: str) -> None:
         """Called when a new service is discovered"""
-        self.executor.submit(self._process_service_async, zeroconf, type_, name)
+        self._enqueue(zeroconf, type_, name)
     
     def update_service(self, zeroconf: Zeroconf, type_: str, name: str) -> None:
         """Called when a service is updated"""
-        self.executor.submit(self._process_service_async, zeroconf, type_, name)
+        self._enqueue(zeroconf, type_, name)
     
     def remove_service(self, zeroconf: Zeroconf, type_: str, name: str) -> None:
         """Called when a service is removed"""
         # Check if it's an OpenFan device
         if name.startswith("uOpenFan"):
+            self._seen.pop(name, None)
             # Extract serial from hostname
             hostname = name.split('.')[0]
             serial = hostname.replace("uOpenFan-", "")
-            if serial in self.fans:
-                del self.fans[serial]
+            with self._fans_lock:
+                removed = self.fans.pop(serial, None)
+            if removed is not None:
                 self.fan_removed.emit(serial)
                 print(f"Fan removed: {serial}")
     
+    def _enqueue(self, zeroconf: Zeroconf, type_: str, name: str) -> None:
+        """Queue a service for resolution unless it is already waiting"""
+        # Skip non-OpenFan services before paying for a service info lookup
+        if name.startswith("uOpenFan") and name not in self._queued:
+            self._queued.add(name)
+            self._queue.put((zeroconf, type_, name))
+    
+    def _resolve_loop(self):
+        """Resolve queued services one at a time until close() is called"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._queued.discard(item[2])
+            try:
+                self._process_service_async(*item)
+            except Exception as e:
+                print(f"Error resolving {item[2]}: {e}")
+    
     def _process_service_async(self, zeroconf: Zeroconf, type_: str, name: str):
-        """Process service info in thread pool"""
-        info = zeroconf.get_service_info(type_, name)
+        """Process service info on the resolver thread"""
+        info = zeroconf.get_service_info(type_, name, timeout=1500)
         if info:
+            # Nothing to do if the announcement repeats what we already know
+            seen = (tuple(info.addresses), info.port)
+            if self._seen.get(name) == seen:
+                return
             self._process_service(info)
+            self._seen[name] = seen
     
     def _process_service(self, info: ServiceInfo) -> None:
         """Process discovered service info"""
@@ -182,48 +456,121 @@ class FanDiscovery(QObject):
         if not info.name.startswith("uOpenFan"):
             return
             
-        if info.addresses:
-            ip = ".".join(map(str, info.addresses[0]))
+        # zeroconf hands back already-formatted address strings
+        addresses = info.parsed_addresses(IPVersion.V4Only)
+        if addresses:
+            ip = addresses[0]
             port = info.port if info.port else 80
             
             # Extract hostname and serial from service name
             hostname = info.name.split('.')[0]
             serial = hostname.replace("uOpenFan-", "")
             
-            if serial and serial not in self.fans:
-                # Extract fan name
-                name = serial.split('-')[0] if '-' in serial else serial
-                
-                fan = Fan(
-                    name=name,
-                    ip=ip,
-                    port=port,
-                    serial_number=serial
-                )
-                
-                # Get initial status
-                fan.get_status()
-                
-                # Get friendly name
-                friendly_name = fan.get_friendly_name()
-                fan.name = friendly_name
-                
-                self.fans[serial] = fan
+            # A known fan that moved is replaced, as its connections point at the old address
+            with self._fans_lock:
+                known = self.fans.get(serial)
+                moved = known is not None and (known.ip, known.port) != (ip, port)
+                if moved:
+                    del self.fans[serial]
+                if not serial or serial in self.fans:
+                    fan = None
+                else:
+                    # Extract fan name
+                    name = serial.split('-')[0] if '-' in serial else serial
+                    
+                    fan = Fan(
+                        name=name,
+                        ip=ip,
+                        port=port,
+                        serial_number=serial
+                    )
+                    
+                    # Get friendly name
+                    friendly_name = fan.get_friendly_name()
+                    fan.name = friendly_name
+                    
+                    self.fans[serial] = fan
+            
+            if moved:
+                self.fan_removed.emit(serial)
+                print(f"Fan {serial} moved from {known.ip}:{known.port} to {ip}:{port}")
+            
+            if fan is not None:
                 self.fan_discovered.emit(fan)
                 print(f"Discovered Fan: {friendly_name} at {ip}:{port}")
+                
+                # Fetch initial status without holding up discovery
+                fan.get_status_async().add_done_callback(
+                    lambda future, fan=fan: self._on_initial_status(fan, future)
+                )
+    
+    def _on_initial_status(self, fan: Fan, future: Future) -> None:
+        """Announce a newly discovered fan once its status arrived"""
+        # A fan replaced after moving may still answer late; don't hand it out
+        if self.fans.get(fan.serial_number) is not fan:
+            return
+        if not future.cancelled() and future.result() is not None:
+            self.fan_updated.emit(fan)
+    
+    def add_cached(self, fan: Fan) -> None:
+        """Announce a fan remembered from a previous run, then check it still answers"""
+        with self._fans_lock:
+            self.fans[fan.serial_number] = fan
+        self.fan_discovered.emit(fan)
+        fan.get_status_async().add_done_callback(
+            lambda future, fan=fan: self._on_cached_status(fan, future)
+        )
+    
+    def _on_cached_status(self, fan: Fan, future: Future) -> None:
+        """Announce a cached fan that answered, re-resolve one that did not
+        
+        A fan that misses its first probe is kept and backs off like any other
+        unreachable fan, since the network may just not be up yet. If it moved,
+        resolving it again replaces it with one at the new address.
+        """
+        if self.fans.get(fan.serial_number) is not fan:
+            return
+        if not future.cancelled() and future.result() is not None:
+            self.fan_updated.emit(fan)
+            return
+        if not future.cancelled():
+            print(f"Cached fan {fan.serial_number} did not answer, rediscovering...")
+            # mDNS may already have skipped it as known, so resolve it again
+            name = f"uOpenFan-{fan.serial_number}._http._tcp.local."
+            self._seen.pop(name, None)
+            if self.zeroconf:
+                self._enqueue(self.zeroconf, "_http._tcp.local.", name)
+
+
+class _ClickToPositionStyle(QProxyStyle):
+    """Jump a slider to a left click instead of paging toward it
+    
+    The press then starts a normal drag, so sliderPressed and sliderReleased
+    still fire.
+    """
+    
+    def styleHint(self, hint, option=None, widget=None, returnData=None):
+        if hint == QStyle.StyleHint.SH_Slider_AbsoluteSetButtons:
+            return Qt.MouseButton.LeftButton.value
+        return super().styleHint(hint, option, widget, returnData)
 
 
 class FanControlWidget(QWidget):
     """Widget for controlling a single fan"""
     
+    user_interacted = pyqtSignal()
+    command_finished = pyqtSignal(bool)  # emitted from the fan's command worker
+    
     def __init__(self, fan: Fan, parent=None):
         super().__init__(parent)
         self.fan = fan
-        self.speed_timer = None
         self.pending_speed = None
+        self._commands_in_flight = 0
+        self.command_finished.connect(self.on_command_finished)
         self.setup_ui()
         
     def setup_ui(self):
+        global _slider_style
         layout = QVBoxLayout()
         layout.setContentsMargins(8, 4, 8, 4)
         layout.setSpacing(4)
@@ -246,6 +593,7 @@ class FanControlWidget(QWidget):
         
         # RPM display
         self.rpm_label = QLabel(f"{self.fan.rpm} RPM")
+        self._shown_rpm = self.fan.rpm
         self.rpm_label.setStyleSheet("color: #808080; font-size: 10px;")
         header_layout.addWidget(self.rpm_label)
         
@@ -265,12 +613,17 @@ class FanControlWidget(QWidget):
         self.speed_slider.setMaximum(100)
         self.speed_slider.setValue(self.fan.speed)
         self.speed_slider.setFixedHeight(20)
-        # Enable jump-to-position on click
         self.speed_slider.setPageStep(1)
         self.speed_slider.setSingleStep(1)
         self.speed_slider.valueChanged.connect(self.on_speed_changed)
-        # Install event filter for click-to-position
-        self.speed_slider.installEventFilter(self)
+        # Commit right away when a drag ends instead of waiting for the debounce
+        self.speed_slider.sliderReleased.connect(self.apply_pending_speed)
+        # Jump to the clicked position
+        if _slider_style is None:
+            _slider_style = _ClickToPositionStyle()
+            # Owned by the application, so Qt deletes it along with the QApplication
+            _slider_style.setParent(QApplication.instance())
+        self.speed_slider.setStyle(_slider_style)
         speed_layout.addWidget(self.speed_slider)
         
         self.speed_value = QLabel(f"{self.fan.speed}%")
@@ -282,15 +635,18 @@ class FanControlWidget(QWidget):
         
         self.setLayout(layout)
         
+        # One reusable debounce timer for slider changes
+        self.speed_timer = QTimer(self)
+        self.speed_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.speed_timer.setSingleShot(True)
+        self.speed_timer.timeout.connect(self.apply_pending_speed)
+        
     def on_power_changed(self, state):
         """Handle power checkbox change"""
         is_on = state == Qt.CheckState.Checked.value
-        # Set power in background thread
-        def set_power():
-            self.fan.set_power(is_on)
-        thread = threading.Thread(target=set_power)
-        thread.daemon = True
-        thread.start()
+        self.user_interacted.emit()
+        # Set power on the fan's command worker
+        self.track_command(self.fan.set_power_async(is_on))
         # Update UI immediately
         self.fan.is_on = is_on
         if is_on and self.fan.speed == 0:
@@ -300,86 +656,194 @@ class FanControlWidget(QWidget):
         """Handle speed slider change with heavy throttling"""
         self.speed_value.setText(f"{value}%")
         self.pending_speed = value
+        self.user_interacted.emit()
         
-        # Cancel previous timer if it exists
-        if self.speed_timer:
-            self.speed_timer.stop()
-            self.speed_timer = None
-            
-        # Create new timer with longer delay for dragging
-        self.speed_timer = QTimer()
-        self.speed_timer.setSingleShot(True)
-        self.speed_timer.timeout.connect(self.apply_pending_speed)
-        self.speed_timer.start(500)  # 500ms delay
+        # Restart the debounce; the fan's command queue already coalesces
+        # writes to one in flight, so a short delay is enough
+        self.speed_timer.start(150)
         
     def apply_pending_speed(self):
         """Apply the pending speed change"""
+        self.speed_timer.stop()
         if self.pending_speed is not None:
             value = self.pending_speed
             self.pending_speed = None
-            # Set speed in background thread
-            def set_speed():
-                self.fan.set_speed(value)
-            thread = threading.Thread(target=set_speed)
-            thread.daemon = True
-            thread.start()
+            # Set speed on the fan's command worker
+            self.track_command(self.fan.set_speed_async(value))
             # Update local state immediately
             self.fan.speed = value
             self.fan.is_on = value > 0
+    
+    def track_command(self, future: Future):
+        """Hold off poll results until a queued command has reached the fan"""
+        self._commands_in_flight += 1
+        # The signal hops back to the GUI thread when the worker finishes;
+        # a command cancelled at quit never reached the fan
+        future.add_done_callback(
+            lambda f: self.command_finished.emit(not f.cancelled() and f.result() is not False)
+        )
+    
+    def on_command_finished(self, ok: bool):
+        """Resync with the fan once its command worker is done"""
+        self._commands_in_flight -= 1
+        if not self._commands_in_flight:
+            self.update_state()
         
     def update_state(self):
         """Update widget to reflect current fan state"""
-        self.power_checkbox.blockSignals(True)
-        self.power_checkbox.setChecked(self.fan.is_on)
-        self.power_checkbox.blockSignals(False)
+        # Skip formatting and relabelling when the value hasn't moved
+        if self.fan.rpm != self._shown_rpm:
+            self._shown_rpm = self.fan.rpm
+            self.rpm_label.setText(f"{self.fan.rpm} RPM")
         
-        self.rpm_label.setText(f"{self.fan.rpm} RPM")
+        # A poll that raced an in-flight command would snap the controls back
+        if self._commands_in_flight:
+            return
         
-        if self.pending_speed is None:  # Only update if not currently dragging
-            self.speed_slider.blockSignals(True)
-            self.speed_slider.setValue(self.fan.speed)
-            self.speed_value.setText(f"{self.fan.speed}%")
-            self.speed_slider.blockSignals(False)
+        # Repaint once for all controls below
+        self.setUpdatesEnabled(False)
+        try:
+            if self.power_checkbox.isChecked() != self.fan.is_on:
+                with QSignalBlocker(self.power_checkbox):
+                    self.power_checkbox.setChecked(self.fan.is_on)
+            
+            # Only update if not currently dragging, and the value actually changed
+            if self.pending_speed is None and self.speed_slider.value() != self.fan.speed:
+                with QSignalBlocker(self.speed_slider):
+                    self.speed_slider.setValue(self.fan.speed)
+                self.speed_value.setText(f"{self.fan.speed}%")
+        finally:
+            self.setUpdatesEnabled(True)
         
     def update_name(self, name: str):
         """Update the fan name label"""
         self.name_label.setText(name)
+
+
+# Dark theme for the popup, kept at module level so it is built only once
+POPUP_STYLESHEET = """
+    #container {
+        background-color: #1e1e1e;
+        border: 1px solid #3c3c3c;
+        border-radius: 8px;
+    }
     
-    def eventFilter(self, source, event):
-        """Event filter to handle click-to-position on slider"""
-        if source == self.speed_slider and event.type() == QEvent.Type.MouseButtonPress:
-            if isinstance(event, QMouseEvent):
-                # Calculate position as percentage
-                click_x = event.position().x()
-                slider_width = self.speed_slider.width()
-                
-                # Calculate the value based on click position
-                if slider_width > 0:
-                    # Account for slider handle width (roughly 12px)
-                    effective_width = slider_width - 12
-                    adjusted_x = max(0, min(click_x - 6, effective_width))
-                    
-                    # Calculate percentage and map to slider range
-                    percentage = adjusted_x / effective_width
-                    min_val = self.speed_slider.minimum()
-                    max_val = self.speed_slider.maximum()
-                    new_value = int(min_val + (max_val - min_val) * percentage)
-                    
-                    # Set the value directly
-                    self.speed_slider.setValue(new_value)
-                    return True  # Event handled
-                    
-        return super().eventFilter(source, event)
+    #title {
+        color: #e0e0e0;
+        font-weight: bold;
+        font-size: 12px;
+        padding: 2px;
+    }
+    
+    #separator {
+        background-color: #3c3c3c;
+        max-height: 1px;
+    }
+    
+    QLabel {
+        color: #e0e0e0;
+    }
+    
+    #no_fans {
+        color: #808080;
+        padding: 15px;
+    }
+    
+    QCheckBox {
+        color: #e0e0e0;
+        spacing: 5px;
+    }
+    
+    QCheckBox::indicator {
+        width: 16px;
+        height: 16px;
+        border: 1px solid #606060;
+        border-radius: 3px;
+        background-color: #2d2d2d;
+    }
+    
+    QCheckBox::indicator:checked {
+        background-color: #0d7377;
+        border-color: #14b8a6;
+    }
+    
+    QSlider::groove:horizontal {
+        height: 4px;
+        background: #3c3c3c;
+        border-radius: 2px;
+    }
+    
+    QSlider::handle:horizontal {
+        width: 12px;
+        height: 12px;
+        background: #14b8a6;
+        border-radius: 6px;
+        margin: -4px 0;
+    }
+    
+    QSlider::sub-page:horizontal {
+        background: #0d7377;
+        border-radius: 2px;
+    }
+    
+    QPushButton {
+        background-color: #2d2d2d;
+        color: #e0e0e0;
+        border: 1px solid #3c3c3c;
+        border-radius: 4px;
+        padding: 2px;
+        font-weight: bold;
+    }
+    
+    QPushButton:hover {
+        background-color: #3c3c3c;
+        border-color: #4c4c4c;
+    }
+    
+    QPushButton:pressed {
+        background-color: #252525;
+    }
+    
+    #refresh_btn, #close_btn {
+        font-size: 14px;
+    }
+    
+    #preset_btn {
+        padding: 4px 8px;
+        font-size: 11px;
+        min-width: 0;
+        background-color: #2d2d2d;
+    }
+    
+    #preset_btn:hover {
+        background-color: #0d7377;
+        border-color: #14b8a6;
+    }
+"""
 
 
 class ControlPopup(QWidget):
     """Popup window for light controls"""
     
+    # Poll tick; a fan whose state stays unchanged is polled every 1, 2, 4,
+    # ... ticks, up to MAX_POLL_TICKS (8 s)
+    POLL_INTERVAL_MS = 500
+    MAX_POLL_TICKS = 16
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.fan_widgets: Dict[str, FanControlWidget] = {}
         self.fans: Dict[str, Fan] = {}  # Store fan references
         self.update_timer = None
+        # Per-fan poll spacing in ticks, and ticks left until each fan is due;
+        # written from poll workers, so guarded by the schedule lock
+        self._poll_every: Dict[str, int] = {}
+        self._ticks_left: Dict[str, int] = {}
+        self._schedule_lock = threading.Lock()
+        # Set while a tick's status requests are still outstanding
+        self._poll_inflight = False
+        # Persistent workers for per-fan HTTP calls, reused across ticks
+        self.poll_pool = ThreadPoolExecutor(max_workers=8)
         self.setup_ui()
         
         # Set window title for identification
@@ -486,105 +950,7 @@ class ControlPopup(QWidget):
         self.setLayout(outer_layout)
         
         # Dark theme styling
-        self.setStyleSheet("""
-            #container {
-                background-color: #1e1e1e;
-                border: 1px solid #3c3c3c;
-                border-radius: 8px;
-            }
-            
-            #title {
-                color: #e0e0e0;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 2px;
-            }
-            
-            #separator {
-                background-color: #3c3c3c;
-                max-height: 1px;
-            }
-            
-            QLabel {
-                color: #e0e0e0;
-            }
-            
-            #no_fans {
-                color: #808080;
-                padding: 15px;
-            }
-            
-            QCheckBox {
-                color: #e0e0e0;
-                spacing: 5px;
-            }
-            
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border: 1px solid #606060;
-                border-radius: 3px;
-                background-color: #2d2d2d;
-            }
-            
-            QCheckBox::indicator:checked {
-                background-color: #0d7377;
-                border-color: #14b8a6;
-            }
-            
-            QSlider::groove:horizontal {
-                height: 4px;
-                background: #3c3c3c;
-                border-radius: 2px;
-            }
-            
-            QSlider::handle:horizontal {
-                width: 12px;
-                height: 12px;
-                background: #14b8a6;
-                border-radius: 6px;
-                margin: -4px 0;
-            }
-            
-            QSlider::sub-page:horizontal {
-                background: #0d7377;
-                border-radius: 2px;
-            }
-            
-            QPushButton {
-                background-color: #2d2d2d;
-                color: #e0e0e0;
-                border: 1px solid #3c3c3c;
-                border-radius: 4px;
-                padding: 2px;
-                font-weight: bold;
-            }
-            
-            QPushButton:hover {
-                background-color: #3c3c3c;
-                border-color: #4c4c4c;
-            }
-            
-            QPushButton:pressed {
-                background-color: #252525;
-            }
-            
-            #refresh_btn, #close_btn {
-                font-size: 14px;
-            }
-            
-            #preset_btn {
-                padding: 4px 8px;
-                font-size: 11px;
-                min-width: 0;
-                background-color: #2d2d2d;
-            }
-            
-            #preset_btn:hover {
-                background-color: #0d7377;
-                border-color: #14b8a6;
-            }
-        """)
+        self.setStyleSheet(POPUP_STYLESHEET)
         
         # Set fixed size to prevent stretching
         self.setFixedWidth(280)
@@ -598,6 +964,7 @@ class ControlPopup(QWidget):
                 self.no_fans_label.setVisible(False)
                 
             widget = FanControlWidget(fan)
+            widget.user_interacted.connect(self.reset_update_interval)
             self.fan_widgets[fan.serial_number] = widget
             self.fans[fan.serial_number] = fan  # Store fan reference
             
@@ -620,16 +987,34 @@ class ControlPopup(QWidget):
             del self.fan_widgets[serial]
             if serial in self.fans:
                 del self.fans[serial]
+            with self._schedule_lock:
+                self._poll_every.pop(serial, None)
+                self._ticks_left.pop(serial, None)
             
             # Show "no fans" label if no fans remain
             if len(self.fan_widgets) == 0:
                 self.no_fans_label.setVisible(True)
                 
+    def apply_delta(self, adds: List[Fan], removes: List[str]):
+        """Apply a batch of discovery changes with a single relayout"""
+        self.setUpdatesEnabled(False)
+        try:
+            # Removals first, so a fan that came back gets a fresh widget
+            # and a fresh poll schedule
+            for serial in removes:
+                self.remove_fan(serial)
+            for fan in adds:
+                self.add_fan(fan)
+        finally:
+            self.setUpdatesEnabled(True)
+    
     def update_fan(self, fan: Fan):
         """Update a fan control widget"""
         if fan.serial_number in self.fan_widgets:
             self.fans[fan.serial_number] = fan  # Update stored fan reference
-            self.fan_widgets[fan.serial_number].update_state()
+            # A hidden popup is brought up to date in one pass by showEvent
+            if self.isVisible():
+                self.fan_widgets[fan.serial_number].update_state()
             
     def showEvent(self, event):
         """Handle show event"""
@@ -640,9 +1025,18 @@ class ControlPopup(QWidget):
         # Start real-time updates when window is shown
         self.start_updates()
         
-        # Update all fan states immediately
-        for widget in self.fan_widgets.values():
-            widget.update_state()
+        # Nothing is polled while hidden: show the last known state now and
+        # fetch fresh status right away instead of waiting for the first tick
+        self.setUpdatesEnabled(False)
+        try:
+            for widget in self.fan_widgets.values():
+                widget.update_state()
+        finally:
+            self.setUpdatesEnabled(True)
+        self.reset_update_interval()
+        for fan in list(self.fans.values()):
+            fan.reset_backoff()
+        self.update_all_fans()
             
     def hideEvent(self, event):
         """Handle hide event"""
@@ -652,95 +1046,159 @@ class ControlPopup(QWidget):
     
     def closeEvent(self, event):
         """Handle window close event"""
-        # Stop updates
+        # Stop updates; the poll pool stays up for when the popup is shown again
         self.stop_updates()
         super().closeEvent(event)
     
+    def shutdown(self):
+        """Stop polling for good and drop any queued fan requests"""
+        self.stop_updates()
+        self.poll_pool.shutdown(wait=False, cancel_futures=True)
+    
+    def changeEvent(self, event):
+        """Pause updates while the popup is minimized"""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.isMinimized():
+                self.stop_updates()
+            elif self.isVisible():
+                self.start_updates()
+    
     def start_updates(self):
         """Start real-time fan status updates"""
         if not self.update_timer:
-            self.update_timer = QTimer()
+            self.update_timer = QTimer(self)
+            # A network poll doesn't need 1ms accuracy; let Qt batch the wakeups
+            self.update_timer.setTimerType(Qt.TimerType.CoarseTimer)
             self.update_timer.timeout.connect(self.update_all_fans)
-            self.update_timer.start(500)  # Update every 500ms
+            self.update_timer.start(self.POLL_INTERVAL_MS)
     
     def stop_updates(self):
         """Stop real-time fan status updates"""
         if self.update_timer:
             self.update_timer.stop()
+            self.update_timer.deleteLater()
             self.update_timer = None
     
+    def reset_update_interval(self):
+        """Poll every fan on each tick again, e.g. after the user changed something"""
+        with self._schedule_lock:
+            self._poll_every.clear()
+            self._ticks_left.clear()
+    
     def update_all_fans(self):
         """Update status for all fans in background thread"""
-        def update_fans():
-            for serial, fan in self.fans.items():
-                try:
-                    # Create temporary fan to get status without modifying shared state
-                    temp_fan = Fan(
-                        name=fan.name,
-                        ip=fan.ip,
-                        port=fan.port,
-                        serial_number=fan.serial_number
-                    )
-                    temp_fan.get_status()
-                    
-                    # Only update if values changed
-                    if (fan.is_on != temp_fan.is_on or 
-                        fan.speed != temp_fan.speed or 
-                        fan.rpm != temp_fan.rpm):
-                        fan.is_on = temp_fan.is_on
-                        fan.speed = temp_fan.speed
-                        fan.rpm = temp_fan.rpm
-                        
-                        # Schedule UI update on main thread
-                        if serial in self.fan_widgets:
-                            widget = self.fan_widgets[serial]
-                            QTimer.singleShot(0, widget.update_state)
-                except Exception as e:
-                    print(f"Error updating fan {serial}: {e}")
-        
-        # Run update in background thread
-        thread = threading.Thread(target=update_fans)
-        thread.daemon = True
-        thread.start()
+        # Slow or unreachable fans must not stack up overlapping polls
+        if self._poll_inflight:
+            return
+        
+        def update_fan(fan: Fan) -> Optional[bool]:
+            """Refresh one fan, returning whether anything changed, or None without a status"""
+            try:
+                return fan.refresh_status()
+            except Exception as e:
+                print(f"Error updating fan {fan.serial_number}: {e}")
+                return None
+        
+        # Only poll the fans that are due this tick
+        items = []
+        with self._schedule_lock:
+            for serial, fan in list(self.fans.items()):
+                left = self._ticks_left.get(serial, 0)
+                if left > 0:
+                    self._ticks_left[serial] = left - 1
+                else:
+                    items.append((serial, fan))
+        if not items:
+            return
+        changed: List[str] = []
+        remaining = [len(items)]
+        lock = threading.Lock()
+        
+        def on_done(serial: str, fan: Fan, future):
+            # Polls cancelled at quit still count, so the last one clears the in-flight flag
+            updated = None if future.cancelled() else future.result()
+            with self._schedule_lock:
+                # A fan removed (or replaced) meanwhile must not get its schedule back
+                if self.fans.get(serial) is not fan:
+                    updated = None
+                else:
+                    # Keep polling a changing fan every tick, back off a steady one;
+                    # an unreachable fan is already backed off by Fan.get_status
+                    if updated is None or updated:
+                        every = 1
+                    else:
+                        every = min(self._poll_every.get(serial, 1) * 2, self.MAX_POLL_TICKS)
+                    self._poll_every[serial] = every
+                    self._ticks_left[serial] = every - 1
+            with lock:
+                if updated:
+                    changed.append(serial)
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if not last:
+                return
+            # Hand all changed fans to the GUI thread in a single hop
+            if changed:
+                QMetaObject.invokeMethod(
+                    self, "apply_batch_updates",
+                    Qt.ConnectionType.QueuedConnection,
+                    Q_ARG(list, changed)
+                )
+            self._poll_inflight = False
+        
+        # Query every fan at once so a tick costs one round trip, not one per fan
+        self._poll_inflight = True
+        submit = self.poll_pool.submit
+        for serial, fan in items:
+            submit(update_fan, fan).add_done_callback(lambda f, s=serial, fan=fan: on_done(s, fan, f))
+    
+    @pyqtSlot(list)
+    def apply_batch_updates(self, serials: list):
+        """Refresh the widgets of every fan that changed in the last poll"""
+        # A poll that finished after the popup was hidden; showEvent catches up
+        if not self.isVisible():
+            return
+        # Repaint once for the whole batch rather than once per widget
+        self.setUpdatesEnabled(False)
+        try:
+            for serial in serials:
+                widget = self.fan_widgets.get(serial)
+                if widget:
+                    widget.update_state()
+        finally:
+            self.setUpdatesEnabled(True)
     
     def set_all_fans_speed(self, speed: int):
         """Set all fans to the same speed"""
-        # Stop the update timer temporarily to avoid conflicts
-        if self.update_timer and self.update_timer.isActive():
-            self.update_timer.stop()
-        
-        # Create a function to set speeds in background
-        def set_speeds():
-            for serial, fan in self.fans.items():
-                try:
-                    # Set speed on the actual fan
-                    fan.set_speed(speed)
-                    # Update the local state
-                    fan.speed = speed
-                    fan.is_on = speed > 0
-                except Exception as e:
-                    print(f"Error setting speed for fan {serial}: {e}")
-        
-        # Run in a separate thread
-        thread = threading.Thread(target=set_speeds)
-        thread.daemon = True
-        thread.start()
-        
-        # Update UI immediately for responsiveness
-        for serial in self.fans:
-            if serial in self.fan_widgets:
-                widget = self.fan_widgets[serial]
-                widget.speed_slider.blockSignals(True)
-                widget.speed_slider.setValue(speed)
-                widget.speed_slider.blockSignals(False)
-                widget.speed_value.setText(f"{speed}%")
-                widget.power_checkbox.blockSignals(True)
-                widget.power_checkbox.setChecked(speed > 0)
-                widget.power_checkbox.blockSignals(False)
-        
-        # Restart the update timer after a delay
-        if self.update_timer:
-            QTimer.singleShot(1000, lambda: self.update_timer.start(500) if self.update_timer else None)
+        self.reset_update_interval()
+        
+        # Queue on each fan's command worker, behind any slider or power write
+        # already in flight, so the preset is always the last value sent
+        for serial, fan in list(self.fans.items()):
+            widget = self.fan_widgets.get(serial)
+            if widget is None:
+                continue
+            # A debounced slider value must not fire after the preset
+            widget.speed_timer.stop()
+            widget.pending_speed = None
+            widget.track_command(fan.set_speed_async(speed))
+            fan.speed = speed
+            fan.is_on = speed > 0
+        
+        # Update UI immediately for responsiveness, repainting once
+        self.setUpdatesEnabled(False)
+        try:
+            for serial in self.fans:
+                if serial in self.fan_widgets:
+                    widget = self.fan_widgets[serial]
+                    with QSignalBlocker(widget.speed_slider):
+                        widget.speed_slider.setValue(speed)
+                    widget.speed_value.setText(f"{speed}%")
+                    with QSignalBlocker(widget.power_checkbox):
+                        widget.power_checkbox.setChecked(speed > 0)
+        finally:
+            self.setUpdatesEnabled(True)
     
     def refresh_requested(self):
         """Signal that refresh was requested"""
@@ -765,14 +1223,25 @@ class WayOpenFanTray(QSystemTrayIcon):
         self.app = app
         self.fans: Dict[str, Fan] = {}
         
+        # Discovery changes are collected briefly and handed to the popup in one batch
+        self._pending_adds: Dict[str, Fan] = {}
+        self._pending_removes: set = set()
+        self._delta_timer = QTimer(self)
+        self._delta_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._delta_timer.setSingleShot(True)
+        self._delta_timer.setInterval(100)
+        self._delta_timer.timeout.connect(self.apply_discovery_delta)
+        
         # Create popup window
         self.popup = ControlPopup()
         self.popup.refresh_requested = self.refresh_fans
         
-        # Setup discovery
-        self.discovery = FanDiscovery()
+        # Setup discovery; Zeroconf lives for the whole app so refreshes keep its cache
+        self.zeroconf = Zeroconf(ip_version=IPVersion.V4Only)
+        self.discovery = FanDiscovery(self.zeroconf)
         self.discovery.fan_discovered.connect(self.on_fan_discovered)
         self.discovery.fan_removed.connect(self.on_fan_removed)
+        self.discovery.fan_updated.connect(self.popup.update_fan)
         
         # Setup UI
         self.setup_tray_icon()
@@ -781,28 +1250,30 @@ class WayOpenFanTray(QSystemTrayIcon):
         # Connect left-click to show popup
         self.activated.connect(self.on_tray_activated)
         
-        # Setup update timer with longer interval
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_fan_states)
-        self.update_timer.start(10000)  # Update every 10 seconds instead of 5
+        # No background polling: the tray icon shows no fan state, so status
+        # is only fetched while the popup is visible
+        
+        # Show last run's fans right away; discovery confirms or replaces them
+        self.load_fan_cache()
         
         # Start discovery
         self.discovery.start()
         
     def setup_tray_icon(self):
         """Setup system tray icon"""
-        # Try to load custom icon first
-        import os
-        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fan-icon.svg")
-        if os.path.exists(icon_path):
-            icon = QIcon(icon_path)
-        else:
-            # Fallback to system icons
-            icon = QIcon.fromTheme("preferences-desktop-display")
-            if icon.isNull():
-                icon = self.app.style().standardIcon(self.app.style().StandardPixmap.SP_ComputerIcon)
-        
-        self.setIcon(icon)
+        global _tray_icon
+        # Resolved once per process; a recreated tray reuses it without touching disk
+        if _tray_icon is None:
+            # Try to load custom icon first
+            if os.path.exists(TRAY_ICON_PATH):
+                _tray_icon = QIcon(TRAY_ICON_PATH)
+            else:
+                # Fallback to system icons
+                _tray_icon = QIcon.fromTheme("preferences-desktop-display")
+                if _tray_icon.isNull():
+                    _tray_icon = self.app.style().standardIcon(self.app.style().StandardPixmap.SP_ComputerIcon)
+        
+        self.setIcon(_tray_icon)
         self.setToolTip("WayOpenFan - Click to control")
         self.show()
         
@@ -842,63 +1313,75 @@ class WayOpenFanTray(QSystemTrayIcon):
     def on_fan_discovered(self, fan: Fan):
         """Handle new fan discovery"""
         self.fans[fan.serial_number] = fan
-        self.popup.add_fan(fan)
+        self._pending_adds[fan.serial_number] = fan
+        self._delta_timer.start()
         
     def on_fan_removed(self, serial: str):
         """Handle fan removal"""
         if serial in self.fans:
-            del self.fans[serial]
-            self.popup.remove_fan(serial)
+            self.fans.pop(serial).close()
+            self._pending_adds.pop(serial, None)
+            self._pending_removes.add(serial)
+            self._delta_timer.start()
+    
+    def apply_discovery_delta(self):
+        """Push the discovery changes collected since the last burst to the popup"""
+        adds, self._pending_adds = list(self._pending_adds.values()), {}
+        removes, self._pending_removes = list(self._pending_removes), set()
+        self.popup.apply_delta(adds, removes)
+        self.save_fan_cache()
+    
+    def load_fan_cache(self):
+        """Add the fans remembered from the last run"""
+        try:
+            entries = json_loads(FAN_CACHE.read_bytes())
+        except (OSError, ValueError):
+            return
+        if not isinstance(entries, list):
+            return
+        for entry in entries:
+            try:
+                fan = Fan(**entry)
+            except TypeError:
+                continue
+            self.discovery.add_cached(fan)
+    
+    def save_fan_cache(self):
+        """Remember the current fans for the next launch"""
+        entries = [
+            {'name': fan.name, 'ip': fan.ip, 'port': fan.port, 'serial_number': fan.serial_number}
+            for fan in self.fans.values()
+        ]
+        try:
+            FAN_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            FAN_CACHE.write_text(json.dumps(entries))
+        except OSError as e:
+            print(f"Could not write fan cache: {e}")
             
-    def update_fan_states(self):
-        """Periodically update fan states in background"""
-        def update_all():
-            for serial, fan in self.fans.items():
-                try:
-                    # Create temporary fan to get status
-                    temp_fan = Fan(
-                        name=fan.name,
-                        ip=fan.ip,
-                        port=fan.port,
-                        serial_number=fan.serial_number
-                    )
-                    temp_fan.get_status()
-                    
-                    # Only update if values changed
-                    if (fan.is_on != temp_fan.is_on or 
-                        fan.speed != temp_fan.speed or 
-                        fan.rpm != temp_fan.rpm):
-                        fan.is_on = temp_fan.is_on
-                        fan.speed = temp_fan.speed
-                        fan.rpm = temp_fan.rpm
-                        # Update popup if it exists
-                        final_fan = fan  # Capture the fan reference
-                        QTimer.singleShot(0, lambda: self.popup.update_fan(final_fan))
-                except Exception as e:
-                    print(f"Error updating fan {serial}: {e}")
-        
-        # Run in background thread
-        thread = threading.Thread(target=update_all)
-        thread.daemon = True
-        thread.start()
-                
     def refresh_fans(self):
         """Manually refresh fan discovery"""
-        self.discovery.stop()
-        self.discovery.start()
+        self.discovery.rescan()
         
+    def _close_discovery(self):
+        """Shut down mDNS browsing and the shared Zeroconf instance"""
+        self.discovery.close()
+        self.zeroconf.close()
+    
     def quit_application(self):
         """Quit the application"""
-        # Stop timers first
-        if self.update_timer:
-            self.update_timer.stop()
-        
-        # Stop popup updates
-        self.popup.stop_updates()
+        # Stop popup updates and cancel queued polls
+        self.popup.shutdown()
         
+        # Stop discovery off the GUI thread: closing Zeroconf joins its
+        # threads and sends goodbyes, so give it at most half a second
+        closer = threading.Thread(target=self._close_discovery, name="discovery-close", daemon=True)
+        closer.start()
+        closer.join(0.5)
         
-        # Stop discovery
-        self.discovery.stop()
+        # Stop fan commands and abort their requests in flight, so the poll and
+        # command threads finish promptly for the exit join
+        for fan in self.fans.values():
+            fan.shutdown()
         
         # Close popup
         self.popup.close()
@@ -907,9 +1390,8 @@ class WayOpenFanTray(QSystemTrayIcon):
         self.app.quit()
 
 
-def main():
-    """Main entry point"""
-    app = QApplication(sys.argv)
+def _configure_app(app: QApplication):
+    """Apply app-wide settings in one place, before any widget is created"""
     app.setQuitOnLastWindowClosed(False)
     
     # Set application identity for Wayland
@@ -917,8 +1399,17 @@ def main():
     app.setOrganizationName("WayOpenFan")
     app.setDesktopFileName("wayopenfan")  # This sets the Wayland app_id
     
-    # Force Fusion style and dark palette
-    app.setStyle("Fusion")
+    # Force Fusion style, unless the platform already picked it
+    if app.style().objectName().lower() != "fusion":
+        app.setStyle("Fusion")
+
+
+def main():
+    """Main entry point"""
+    # Attributes only take full effect when set before the app exists
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_CompressHighFrequencyEvents, True)
+    app = QApplication(sys.argv)
+    _configure_app(app)
     
     # Create system tray
     tray = WayOpenFanTray(app)